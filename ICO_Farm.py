@@ -3,16 +3,16 @@ import json
 import csv
 import math
 import time
-import numpy
+import argparse
+import itertools
+import statistics
 from pathlib import Path
-from pprint import pprint
 from datetime import datetime
 
-from modules.strategy_simulator_2017 import StrategySimulator2017
-from modules.strategy_simulator import StrategySimulator
-from modules.particle_swarm_optimizer import ParticleSwarmOptimizer
+# heavy modules (NumPy, pyswarm) are imported inside the subcommands that need them
+
+DATA_DIRECTORY = Path(__file__).resolve().parent / 'data'
 
-data = {}
 fixed_parameters = [
     # start amount [usd]
     1000,
@@ -26,114 +26,234 @@ fixed_parameters = [
     5
 ]
 
+strategy = [
+    # target factor
+    2.5,
+    # maximum number of days before an ICO investment is harvested
+    7,
+    # investment spread increase after a generation has been completed
+    0,
+    # minimum percentage to upgrade to next generation [%]
+    92
+]
+
 
 # main method
-def main():
-    global data
+def main(argv = None):
+    parser = buildArgumentParser()
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    args.command(args)
+    print("\n--- %s seconds ---" % (time.time() - start_time))
+
+
+# build the command-line interface
+def buildArgumentParser():
+    parser = argparse.ArgumentParser(prog='ico-farm', description="Simulate and optimize ICO investment strategies.")
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIRECTORY, help="directory containing past-icos.csv and the ICO price files")
+    subparsers = parser.add_subparsers(title='commands', metavar='COMMAND')
+    subparsers.required = True
+
+    simulate = subparsers.add_parser('simulate', help="simulate a single run of a strategy with logging")
+    addFixedParameterArguments(simulate)
+    addStrategyArguments(simulate)
+    addSimulatorArgument(simulate)
+    simulate.set_defaults(command=manualStrategy)
+
+    multi_run = subparsers.add_parser('multi-run', help="simulate a strategy multiple times and print profit statistics")
+    addFixedParameterArguments(multi_run)
+    addStrategyArguments(multi_run)
+    addSimulatorArgument(multi_run)
+    multi_run.add_argument('--runs', type=int, default=100, help="number of runs (default: %(default)s)")
+    multi_run.set_defaults(command=manualStrategyMultipleRuns)
+
+    optimize = subparsers.add_parser('optimize', help="search the best strategy using Particle Swarm Optimization")
+    addFixedParameterArguments(optimize)
+    optimize.add_argument('--swarmsize', type=int, default=100, help="number of particles (default: %(default)s)")
+    optimize.add_argument('--maxiter', type=int, default=5, help="maximum number of iterations (default: %(default)s)")
+    optimize.add_argument('--runs-per-strategy', type=int, default=20, help="runs used to find the worst case profit of a strategy (default: %(default)s)")
+    optimize.set_defaults(command=particleSwarmOptimization)
+
+    stats = subparsers.add_parser('stats', help="print the average profit factor for each waiting period after an ICO has ended")
+    stats.add_argument('--min-count', type=int, default=5, help="only print durations with more ICOs than this (default: %(default)s)")
+    stats.set_defaults(command=averageFactorPerDuration)
+
+    sweep = subparsers.add_parser('sweep', help="simulate every combination of the given strategy parameter values")
+    addFixedParameterArguments(sweep)
+    addStrategyArguments(sweep, nargs='+')
+    addSimulatorArgument(sweep)
+    sweep.add_argument('--runs', type=int, default=20, help="number of runs per strategy (default: %(default)s)")
+    sweep.set_defaults(command=strategySweep)
+
+    return parser
+
+
+# add the fixed parameters as optional arguments
+def addFixedParameterArguments(parser):
+    group = parser.add_argument_group('fixed parameters')
+    group.add_argument('--start-amount', type=float, default=fixed_parameters[0], help="start amount [usd] (default: %(default)s)")
+    group.add_argument('--start-date', default=fixed_parameters[1], help="strategy start date (default: %(default)s)")
+    group.add_argument('--end-date', default=fixed_parameters[2], help="strategy end date (default: %(default)s)")
+    group.add_argument('--ico-duration', type=int, default=fixed_parameters[3], help="average ICO duration [days] (default: %(default)s)")
+    group.add_argument('--spread-factor', type=float, default=fixed_parameters[4], help="start spread factor (default: %(default)s)")
+
+
+# add the strategy parameters as optional arguments, accepting multiple values if nargs is given
+def addStrategyArguments(parser, nargs = None):
+    group = parser.add_argument_group('strategy')
+    defaults = strategy if nargs is None else [[value] for value in strategy]
+    group.add_argument('--target-factor', type=float, nargs=nargs, default=defaults[0], help="target factor (default: %(default)s)")
+    group.add_argument('--max-days', type=float, nargs=nargs, default=defaults[1], help="maximum number of days before an ICO investment is harvested (default: %(default)s)")
+    group.add_argument('--spread-increase', type=float, nargs=nargs, default=defaults[2], help="investment spread increase after a generation has been completed (default: %(default)s)")
+    group.add_argument('--upgrade-percentage', type=float, nargs=nargs, default=defaults[3], help="minimum percentage to upgrade to next generation [%%] (default: %(default)s)")
+
+
+# add the choice of strategy simulator
+def addSimulatorArgument(parser):
+    parser.add_argument('--simulator', choices=['random', '2017'], default='random',
+        help="'random' invests in randomly chosen past ICOs, '2017' replays the actual ICO calendar (default: %(default)s)")
+
+
+# return the fixed parameters list from the parsed arguments
+def getFixedParameters(args):
+    return [args.start_amount, args.start_date, args.end_date, args.ico_duration, args.spread_factor]
+
+
+# return the strategy list from the parsed arguments
+def getStrategy(args):
+    return [args.target_factor, args.max_days, args.spread_increase, args.upgrade_percentage]
+
 
+# return the simulator class for the given choice
+def getSimulatorClass(simulator):
+    if simulator == '2017':
+        from modules.strategy_simulator_2017 import StrategySimulator2017
+        return StrategySimulator2017
+
+    from modules.strategy_simulator import StrategySimulator
+    return StrategySimulator
+
+
+# load the data needed to simulate strategies with the given arguments
+def loadSimulationData(args, fixed_parameters):
+    end_window = None
+    if getattr(args, 'simulator', 'random') == '2017':
+        # the 2017 simulator only invests in ICOs ending within the strategy period (+ one ICO duration)
+        end_window = (
+            dateToEpoch(fixed_parameters[1]),
+            addDays(dateToEpoch(fixed_parameters[2]), fixed_parameters[3])
+        )
+    return loadData(args.data_dir, end_window)
+
+
+# load all usable past ICOs and their factors, optionally only those ending within the given epoch window
+def loadData(data_directory, end_window = None):
     icos = {}
     factors = {}
 
     print("Processing data from past ICOs..")
-    
-    with open('data/past-icos.csv') as csvfile:
+
+    with open(data_directory / 'past-icos.csv') as csvfile:
         reader = csv.DictReader(csvfile)
         for ico in reader:
             symbol = ico['symbol']
             if ico['end'] == '':
                 continue
             ico['end'] = dateToEpoch(ico['end'])
-            ico, factors = processICO(ico, factors)
+            if end_window is not None and not (end_window[0] < ico['end'] < end_window[1]):
+                continue
+            ico, factors = processICO(ico, factors, data_directory)
             if ico != False:
                 icos[symbol] = ico
 
-    # set data
-    data['factors'] = factors
-    data['icos'] = icos
-    
-    start_time = time.time()
-
-    # uncomment desired method
-    #averageFactorPerDuration(factors)
-    manualStrategy()
-    #manualStrategyMultipleRuns(100)
-    #particleSwarmOptimization()
-
-    print("\n--- %s seconds ---" % (time.time() - start_time))
+    return {
+        'factors': factors,
+        'icos': icos
+    }
 
 
 # manually test a strategy
-def manualStrategy():
-    global data
-    global fixed_parameters
+def manualStrategy(args):
+    fixed_parameters = getFixedParameters(args)
+    data = loadSimulationData(args, fixed_parameters)
 
     print("Executing manual strategy")
 
-    results = []
-    strategy = [
-        # target factor
-        2.5,
-        # maximum number of days before an ICO investment is harvested
-        7,
-        # investment spread increase after a generation has been completed
-        0,
-        # minimum percentage to upgrade to next generation [%]
-        92
-    ]
-    simulator = StrategySimulator(data, fixed_parameters, True)
-    profit = simulator.evaluate(strategy)
+    simulator = getSimulatorClass(args.simulator)(data, fixed_parameters, True)
+    profit = simulator.evaluate(getStrategy(args))
     print("\nTOTAL PROFIT: $" + str(round(profit - fixed_parameters[0])))
 
 
 # manually test a strategy using multiple runs
-def manualStrategyMultipleRuns(number_of_runs):
-    global data
-    global fixed_parameters
+def manualStrategyMultipleRuns(args):
+    fixed_parameters = getFixedParameters(args)
+    data = loadSimulationData(args, fixed_parameters)
+    Simulator = getSimulatorClass(args.simulator)
+    number_of_runs = args.runs
 
     print("Executing manual strategy with multiple runs")
 
     results = []
     for i in range(0, number_of_runs):
-        strategy = [
-            # target factor
-            2.5,
-            # maximum number of days before an ICO investment is harvested
-            7,
-            # investment spread increase after a generation has been completed
-            0,
-            # minimum percentage to upgrade to next generation [%]
-            92
-        ]
-        simulator = StrategySimulator(data, fixed_parameters, False)
-        profit = simulator.evaluate(strategy)
+        simulator = Simulator(data, fixed_parameters, False)
+        profit = simulator.evaluate(getStrategy(args))
         results.append(profit)
 
         # print status
         print(str(round(i * 100 / number_of_runs, 2)) + "%")
         # print current statistics
-        print("min: $" + str(round(numpy.min(results))) + " median: $" + str(round(numpy.median(results))) + " average: $" + str(round(numpy.average(results))) + " max: $" + str(round(numpy.max(results))))
+        print(profitStatistics(results))
 
     # print sorted profits of all runs of the chosen strategy
     print("Sorted strategy profits:")
     print(sorted(results))
 
-    
+
+# simulate every combination of the given strategy parameter values using multiple runs
+def strategySweep(args):
+    fixed_parameters = getFixedParameters(args)
+    data = loadSimulationData(args, fixed_parameters)
+    Simulator = getSimulatorClass(args.simulator)
+    strategies = list(itertools.product(args.target_factor, args.max_days, args.spread_increase, args.upgrade_percentage))
+
+    print("Executing strategy sweep over " + str(len(strategies)) + " strategies")
+
+    for strategy in strategies:
+        results = []
+        for i in range(0, args.runs):
+            simulator = Simulator(data, fixed_parameters, False)
+            results.append(simulator.evaluate(list(strategy)))
+
+        print(str(list(strategy)) + " " + profitStatistics(results))
+
+
+# return a summary of the given strategy profits
+def profitStatistics(results):
+    return "min: $" + str(round(min(results))) + " median: $" + str(round(statistics.median(results))) + " average: $" + str(round(statistics.fmean(results))) + " max: $" + str(round(max(results)))
+
+
 # perform Particle Swarm Optimization
-def particleSwarmOptimization():
-    global data
-    global fixed_parameters
+def particleSwarmOptimization(args):
+    from modules.particle_swarm_optimizer import ParticleSwarmOptimizer
+
+    fixed_parameters = getFixedParameters(args)
+    data = loadData(args.data_dir)
 
     optimizer = ParticleSwarmOptimizer(data, fixed_parameters)
+    optimizer.swarmsize = args.swarmsize
+    optimizer.maxiter = args.maxiter
+    optimizer.runs_per_strategy = args.runs_per_strategy
     optimizer.optimize()
 
 
 # process the given ICO and store for each duration the achieved factor
-def processICO(ico, all_factors):
+def processICO(ico, all_factors, data_directory = DATA_DIRECTORY):
     if ico['ico_token_price'] == '':
         return False, all_factors
     
     symbol = ico['symbol']
-    data_file_path = Path('data/' + symbol + '.json')
+    data_file_path = data_directory / (symbol + '.json')
     if not data_file_path.is_file():
         return False, all_factors
     
@@ -177,7 +297,7 @@ def processICO(ico, all_factors):
         # compute average factor per day, since it is impossible to pinpoint the exact price peak each day
         average_factors_per_day = {}
         for duration, factors in factors.items():
-            average_factors_per_day[duration] = numpy.average(factors)
+            average_factors_per_day[duration] = sum(factors) / len(factors)
             
         # add factors to all factors
         all_factors[symbol] = average_factors_per_day
@@ -204,7 +324,9 @@ def addDays(start, days):
 
 
 # compute the average profit factor for each duration
-def averageFactorPerDuration(all_factors):
+def averageFactorPerDuration(args):
+    all_factors = loadData(args.data_dir)['factors']
+
     print("Computing average profit factor for each waiting period after an ICO has ended..")
 
     counts = {}
@@ -221,7 +343,7 @@ def averageFactorPerDuration(all_factors):
 
     factors = {}
     for duration in counts:
-        if counts[duration] > 5:
+        if counts[duration] > args.min_count:
             factors[duration] = {
                 'average': round(sums[duration] / counts[duration], 2),
                 'count': counts[duration]